@@ -1,28 +1,157 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from sentence_transformers import SentenceTransformer
+import torch
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv
+from contextlib import closing
+from dataclasses import dataclass
 import os
 import re
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SHL Assessment Recommendation System",
     description="API for recommending SHL assessments based on job descriptions and queries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+
+# Sentence encoder backed by an int8-quantized ONNX export of the model
+class OnnxSentenceEncoder:
+    def __init__(self, model_dir: str, model_file: str, max_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            providers=['CPUExecutionProvider']
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Batch sentences of similar length together to minimise padding
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        embeddings = None
+        for start in range(0, len(sentences), batch_size):
+            batch_idx = order[start:start + batch_size]
+            features = self.tokenizer(
+                [sentences[i] for i in batch_idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors='np'
+            )
+            inputs = {name: value for name, value in features.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+
+            # Mean-pool token embeddings over the attention mask
+            mask = features['attention_mask'][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if embeddings is None:
+                embeddings = np.empty((len(sentences), pooled.shape[1]), dtype=np.float32)
+            embeddings[batch_idx] = pooled
+
+        if embeddings is None:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+# Initialize the sentence transformer model, using the quantized ONNX export when configured
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR")
+if ONNX_MODEL_DIR:
+    ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "model.int8.onnx")
+    # The full model path identifies the backend in embedding cache keys
+    MODEL_ID = os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)
+    model = OnnxSentenceEncoder(ONNX_MODEL_DIR, ONNX_MODEL_FILE)
+else:
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = SentenceTransformer(MODEL_NAME, device=device)
+    if device == 'cuda':
+        model = model.half()
+    # Device and precision change the embeddings, so they are part of the cache key
+    MODEL_ID = f"{MODEL_NAME}:{device}:{'float16' if device == 'cuda' else 'float32'}"
+
+# Catalog location and cache settings
+BASE_URL = "https://www.shl.com"
+CATALOG_URL = f"{BASE_URL}/solutions/products/product-catalog/"
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+CATALOG_TTL = int(os.getenv("CATALOG_TTL", "3600"))
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "32"))
+QUERY_BATCH_WAIT_MS = float(os.getenv("QUERY_BATCH_WAIT_MS", "5"))
+# Floor of one second so a small TTL can't make the refresh job scrape back-to-back
+CATALOG_REFRESH_INTERVAL = max(1, int(os.getenv("CATALOG_REFRESH_INTERVAL", str(CATALOG_TTL // 2))))
+CATALOG_DB_PATH = os.path.join(CACHE_DIR, "catalog.db")
+CATALOG_DB_VERSION = 2
+
+# Assessment embeddings (stored as float16) keyed by a hash of the model and text they were encoded from
+_embedding_cache = {}
+_embedding_lock = threading.Lock()
+
+# Shared HTTP session so catalog scrapes reuse pooled keep-alive connections
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+_http_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+_session.mount('https://', _http_adapter)
+_session.mount('http://', _http_adapter)
+
+# Patterns and keywords used while parsing the catalog and filtering results
+_DURATION_RE = re.compile(r'\d+\s*(?:minutes?|mins?)', re.IGNORECASE)
+_INT_RE = re.compile(r'\d+')
+
+# Only parse elements that can hold assessment cards; every selector pattern
+# used by the scraper matches a class containing one of these keywords
+_CATALOG_STRAINER = SoupStrainer(
+    ['div', 'article', 'section'],
+    class_=lambda x: x and any(keyword in x.lower() for keyword in ['product', 'assessment', 'catalog'])
 )
 
-# Initialize the sentence transformer model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Test-type keywords in priority order, compiled into a single pattern so the
+# text is scanned once for every keyword of every category
+_TEST_TYPE_KEYWORDS = {
+    'Cognitive': frozenset({'cognitive', 'ability', 'aptitude'}),
+    'Personality': frozenset({'personality', 'behavior', 'style'}),
+    'Skills': frozenset({'skill', 'proficiency', 'knowledge'}),
+}
+_KEYWORD_CATEGORY = {
+    keyword: category
+    for category, keywords in _TEST_TYPE_KEYWORDS.items()
+    for keyword in keywords
+}
+_KEYWORD_RE = re.compile('|'.join(sorted(map(re.escape, _KEYWORD_CATEGORY), key=len, reverse=True)))
 
 # Define request model
 class QueryRequest(BaseModel):
@@ -42,131 +171,423 @@ class Assessment(BaseModel):
 class RecommendationResponse(BaseModel):
     recommendations: List[Assessment]
 
+# Everything a request needs from the catalog, built once and swapped atomically on refresh.
+# Stored column-wise; Assessment models are only built for the assessments returned.
+@dataclass
+class CatalogArtifact:
+    names: List[str]
+    urls: List[str]
+    remote_testing: np.ndarray
+    adaptive_support: np.ndarray
+    durations_str: List[str]
+    durations_int: np.ndarray
+    test_types: np.ndarray
+    embeddings: np.ndarray
+    built_at: float
+
+    def __len__(self):
+        return len(self.names)
+
+    def assessment(self, i) -> Assessment:
+        return Assessment(
+            name=self.names[i],
+            url=self.urls[i],
+            remote_testing=bool(self.remote_testing[i]),
+            adaptive_support=bool(self.adaptive_support[i]),
+            duration=self.durations_str[i],
+            test_type=str(self.test_types[i])
+        )
+
+# Current catalog artifact; stale artifacts keep being served while a refresh runs
+_catalog_artifact: Optional[CatalogArtifact] = None
+_catalog_build_lock = asyncio.Lock()
+_catalog_refresh_task: Optional[asyncio.Task] = None
+
 # Function to scrape SHL catalog
 def scrape_shl_catalog():
-    base_url = "https://www.shl.com"
-    catalog_url = f"{base_url}/solutions/products/product-catalog/"
-    max_retries = 3
+    base_url = BASE_URL
+    catalog_url = CATALOG_URL
     timeout = 10
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            session = requests.Session()
-            response = session.get(catalog_url, timeout=timeout, headers=headers, allow_redirects=True)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+
+    try:
+        # Retries for transient failures are handled by the session's adapter
+        response = _session.get(catalog_url, timeout=timeout, allow_redirects=True)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_CATALOG_STRAINER)
+        
+        assessments = []
+        # Find all assessment cards/sections using multiple selector patterns
+        assessment_sections = []
+        selector_patterns = [
+            {'tags': ['div', 'article'], 'classes': ['product-card', 'assessment-item']},
+            {'tags': ['div'], 'classes': ['product', 'assessment', 'catalog-item']},
+            {'tags': ['section', 'div'], 'classes': ['product-listing', 'assessment-listing']}
+        ]
+        
+        for pattern in selector_patterns:
+            sections = soup.find_all(pattern['tags'], class_=lambda x: x and any(c in x for c in pattern['classes']))
+            if sections:
+                assessment_sections.extend(sections)
+                break
+        
+        if not assessment_sections:
+            # Try a more general approach to find potential assessment sections
+            sections = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and any(keyword in x.lower() for keyword in ['product', 'assessment', 'catalog']))
+            if sections:
+                assessment_sections.extend(sections)
+            else:
+                raise ValueError("No assessment sections found on the page. The page structure might have changed.")
+        
+        for section in assessment_sections:
+            # Try multiple selectors for name
+            name_elem = section.find(['h3', 'h2', '.assessment-title'])
+            name = name_elem.text.strip() if name_elem else ''
             
-            assessments = []
-            # Find all assessment cards/sections using multiple selector patterns
-            assessment_sections = []
-            selector_patterns = [
-                {'tags': ['div', 'article'], 'classes': ['product-card', 'assessment-item']},
-                {'tags': ['div'], 'classes': ['product', 'assessment', 'catalog-item']},
-                {'tags': ['section', 'div'], 'classes': ['product-listing', 'assessment-listing']}
-            ]
+            # Try multiple selectors for URL
+            url_elem = section.find('a')
+            url = ''
+            if url_elem and 'href' in url_elem.attrs:
+                href = url_elem['href']
+                if href.startswith('/'):
+                    url = base_url + href
+                elif href.startswith('http'):
+                    url = href
+                else:
+                    url = base_url + '/' + href
             
-            for pattern in selector_patterns:
-                sections = soup.find_all(pattern['tags'], class_=lambda x: x and any(c in x for c in pattern['classes']))
-                if sections:
-                    assessment_sections.extend(sections)
-                    break
+            # Try multiple selectors for description
+            desc_elem = section.find(['p', '.assessment-description'])
+            description = desc_elem.text.strip() if desc_elem else ''
             
-            if not assessment_sections:
-                # Try a more general approach to find potential assessment sections
-                sections = soup.find_all(['div', 'article', 'section'], class_=lambda x: x and any(keyword in x.lower() for keyword in ['product', 'assessment', 'catalog']))
-                if sections:
-                    assessment_sections.extend(sections)
-                else:
-                    raise ValueError("No assessment sections found on the page. The page structure might have changed.")
+            # More robust duration extraction
+            duration_match = _DURATION_RE.search(description)
+            duration = duration_match.group(0) if duration_match else 'Not specified'
             
-            for section in assessment_sections:
-                # Try multiple selectors for name
-                name_elem = section.find(['h3', 'h2', '.assessment-title'])
-                name = name_elem.text.strip() if name_elem else ''
-                
-                # Try multiple selectors for URL
-                url_elem = section.find('a')
-                url = ''
-                if url_elem and 'href' in url_elem.attrs:
-                    href = url_elem['href']
-                    if href.startswith('/'):
-                        url = base_url + href
-                    elif href.startswith('http'):
-                        url = href
-                    else:
-                        url = base_url + '/' + href
-                
-                # Try multiple selectors for description
-                desc_elem = section.find(['p', '.assessment-description'])
-                description = desc_elem.text.strip() if desc_elem else ''
-                
-                # More robust duration extraction
-                duration_match = re.search(r'\d+\s*(?:minutes?|mins?)', description, re.IGNORECASE)
-                duration = duration_match.group(0) if duration_match else 'Not specified'
-                
-                # More comprehensive test type detection
-                test_type = 'General'
-                if any(keyword in description.lower() or keyword in name.lower() 
-                       for keyword in ['cognitive', 'ability', 'aptitude']):
-                    test_type = 'Cognitive'
-                elif any(keyword in description.lower() or keyword in name.lower() 
-                         for keyword in ['personality', 'behavior', 'style']):
-                    test_type = 'Personality'
-                elif any(keyword in description.lower() or keyword in name.lower() 
-                         for keyword in ['skill', 'proficiency', 'knowledge']):
-                    test_type = 'Skills'
-                
-                if name and url:  # Only add if we have at least a name and URL
-                    assessments.append(Assessment(
-                        name=name,
-                        url=url,
-                        remote_testing=True,
-                        adaptive_support=False,
-                        duration=duration,
-                        test_type=test_type
-                    ))
+            # More comprehensive test type detection
+            hits = {_KEYWORD_CATEGORY[m.group()] for m in _KEYWORD_RE.finditer(f"{name} {description}".lower())}
+            test_type = next((category for category in _TEST_TYPE_KEYWORDS if category in hits), 'General')
             
-            if not assessments:
-                raise ValueError("No valid assessments could be extracted from the page.")
-                
-            return assessments
+            if name and url:  # Only add if we have at least a name and URL
+                assessments.append(Assessment(
+                    name=name,
+                    url=url,
+                    remote_testing=True,
+                    adaptive_support=False,
+                    duration=duration,
+                    test_type=test_type
+                ))
+        
+        if not assessments:
+            raise ValueError("No valid assessments could be extracted from the page.")
             
-        except requests.Timeout:
-            if attempt == max_retries - 1:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Failed to fetch assessments: Connection timeout. Please try again later."
-                )
-        except requests.RequestException as e:
-            if attempt == max_retries - 1:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Failed to fetch assessments: Network error - {str(e)}"
-                )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to parse assessments: {str(e)}"
+        return assessments
+        
+    except requests.Timeout:
+        raise HTTPException(
+            status_code=503,
+            detail="Failed to fetch assessments: Connection timeout. Please try again later."
+        )
+    except requests.RequestException as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Failed to fetch assessments: Network error - {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to parse assessments: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error while fetching assessments: {str(e)}"
+        )
+
+# Function to open the on-disk catalog store, creating its tables on first use
+def _connect_db():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    # The store is a disposable cache, so a layout change simply starts it afresh
+    if conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_DB_VERSION:
+        conn.executescript(f"""
+            DROP TABLE IF EXISTS assessments;
+            DROP TABLE IF EXISTS embeddings;
+            DROP TABLE IF EXISTS catalog_meta;
+            PRAGMA user_version = {CATALOG_DB_VERSION};
+        """)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            url TEXT NOT NULL,
+            remote_testing INTEGER NOT NULL,
+            adaptive_support INTEGER NOT NULL,
+            duration TEXT NOT NULL,
+            test_type TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            vector BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """)
+    return conn
+
+# Function to load the previously scraped catalog and its scrape time from disk
+def _load_catalog_from_disk():
+    try:
+        with closing(_connect_db()) as conn:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'scraped_at'").fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT name, url, remote_testing, adaptive_support, duration, test_type "
+                "FROM assessments ORDER BY id"
+            ).fetchall()
+    except (sqlite3.Error, OSError):
+        return None
+    if not rows:
+        return None
+    return [Assessment(**dict(row)) for row in rows], float(row['value'])
+
+# Function to persist the scraped catalog so restarts stay warm
+def _save_catalog_to_disk(assessments, scraped_at):
+    try:
+        with closing(_connect_db()) as conn, conn:
+            conn.execute("DELETE FROM assessments")
+            conn.executemany(
+                "INSERT INTO assessments (name, url, remote_testing, adaptive_support, duration, test_type) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(a.name, a.url, a.remote_testing, a.adaptive_support, a.duration, a.test_type) for a in assessments]
             )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Unexpected error while fetching assessments: {str(e)}"
+            conn.execute(
+                "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('scraped_at', ?)",
+                (str(scraped_at),)
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+# Function to parse each duration in minutes, -1 where unspecified
+def parse_durations(durations):
+    return np.array(
+        [int(m.group()) if (m := _INT_RE.search(duration)) else -1 for duration in durations],
+        dtype=np.int32
+    )
+
+# Function to encode a text or list of texts into unit-length embeddings
+def encode_texts(texts):
+    # SentenceTransformer.encode sorts inputs by length before batching and
+    # restores the original order, so each batch pads only to similar lengths
+    return model.encode(
+        texts,
+        batch_size=ENCODE_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
+
+# Function to process query and get embeddings (a single string encodes to a 1-D vector)
+def process_query(query: str) -> np.ndarray:
+    return encode_texts(query)
+
+# Coalesces queries from concurrent requests into a single encode call
+class QueryBatcher:
+    def __init__(self, max_batch_size: int, max_wait: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = None
+        self._loop = None
+        self._task = None
+
+    # Start the runner on first use (and again if it died or the event loop changed),
+    # so encode() never waits on a runner that was never started
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self.queue = asyncio.Queue()
+            self._loop = loop
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def encode(self, query: str) -> np.ndarray:
+        self._ensure_running()
+        future = self._loop.create_future()
+        await self.queue.put((query, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            # Give concurrent requests a moment to join this batch
+            await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            queries = [query for query, _ in batch]
+            try:
+                if len(queries) == 1:
+                    embeddings = [await asyncio.to_thread(process_query, queries[0])]
+                else:
+                    embeddings = await asyncio.to_thread(encode_texts, queries)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+query_batcher = QueryBatcher(ENCODE_BATCH_SIZE, QUERY_BATCH_WAIT_MS / 1000)
+
+# Function to read previously encoded embeddings from disk into memory
+def _load_embeddings_from_disk(keys):
+    try:
+        with closing(_connect_db()) as conn:
+            for key in keys:
+                row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    _embedding_cache[key] = np.frombuffer(row['vector'], dtype=np.float16)
+    except (sqlite3.Error, OSError):
+        pass
+
+# Function to persist newly encoded embeddings so restarts stay warm
+def _save_embeddings_to_disk(entries):
+    try:
+        with closing(_connect_db()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, embedding.tobytes()) for key, embedding in entries.items()]
             )
+    except (sqlite3.Error, OSError):
+        pass
+
+# Function to get embeddings for assessment description texts, encoding only texts not seen before
+def get_assessment_embeddings(texts):
+    keys = [hashlib.sha1(f"{MODEL_ID}:{text}".encode()).hexdigest() for text in texts]
 
-# Function to process query and get embeddings
-def process_query(query: str):
-    return model.encode([query])[0]
+    with _embedding_lock:
+        missing_indices = [i for i, key in enumerate(keys) if key not in _embedding_cache]
+        if missing_indices:
+            _load_embeddings_from_disk([keys[i] for i in missing_indices])
+            missing_indices = [i for i in missing_indices if keys[i] not in _embedding_cache]
 
-# Function to get assessment embeddings
-def get_assessment_embeddings(assessments):
+        # Generate embeddings for cache misses only, encoding duplicate texts once
+        if missing_indices:
+            missing_texts = {keys[i]: texts[i] for i in missing_indices}
+            new_embeddings = encode_texts(list(missing_texts.values()))
+            new_entries = dict(zip(missing_texts.keys(), new_embeddings.astype(np.float16)))
+            _embedding_cache.update(new_entries)
+            _save_embeddings_to_disk(new_entries)
+
+        return np.stack([_embedding_cache[key] for key in keys])  # C-contiguous (N, dim) float16
+
+# Function to score the float32 assessment embedding matrix against a query
+def compute_similarities(assessment_embeddings, query_embedding):
+    return assessment_embeddings @ query_embedding.astype(np.float32, copy=False)
+
+# Function to get indices of the k highest similarities in descending order
+def top_k_indices(similarities, k):
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top_idx = np.argpartition(-similarities, k - 1)[:k]
+    return top_idx[np.argsort(-similarities[top_idx], kind='stable')]
+
+# Function to build a catalog artifact, encoding any assessments not seen before
+def _build_catalog_artifact(assessments, built_at):
+    names = [a.name for a in assessments]
+    durations_str = [a.duration for a in assessments]
+    test_types = [a.test_type for a in assessments]
     # Create description texts for each assessment
-    texts = [f"{a.name} {a.test_type} assessment. Duration: {a.duration}" for a in assessments]
-    # Generate embeddings
-    return model.encode(texts)
+    texts = [f"{name} {test_type} assessment. Duration: {duration}"
+             for name, test_type, duration in zip(names, test_types, durations_str)]
+    return CatalogArtifact(
+        names=names,
+        urls=[a.url for a in assessments],
+        remote_testing=np.array([a.remote_testing for a in assessments], dtype=bool),
+        adaptive_support=np.array([a.adaptive_support for a in assessments], dtype=bool),
+        durations_str=durations_str,
+        durations_int=parse_durations(durations_str),
+        test_types=np.array(test_types),
+        # Upcast once per build: NumPy has no BLAS kernel for float16, so scoring
+        # float16 directly would copy the whole matrix on every request
+        embeddings=get_assessment_embeddings(texts).astype(np.float32),
+        built_at=built_at
+    )
+
+# Function to scrape the catalog, persist it and build a fresh artifact
+def _scrape_catalog_artifact():
+    assessments = scrape_shl_catalog()
+    built_at = time.time()
+    _save_catalog_to_disk(assessments, built_at)
+    return _build_catalog_artifact(assessments, built_at)
+
+# Function to build the first artifact, preferring the on-disk copy even if it is stale
+def _load_catalog_artifact():
+    stored = _load_catalog_from_disk()
+    if stored is not None:
+        return _build_catalog_artifact(*stored)
+    return _scrape_catalog_artifact()
+
+# Function to rebuild the catalog artifact and swap it in once complete
+async def _refresh_catalog():
+    global _catalog_artifact
+    try:
+        _catalog_artifact = await asyncio.to_thread(_scrape_catalog_artifact)
+    except Exception:
+        # Keep serving the current artifact until the next attempt
+        logger.exception("Catalog refresh failed; serving the catalog built at %s",
+                         _catalog_artifact.built_at if _catalog_artifact else None)
+
+# Function to start a catalog refresh unless one is already running
+def refresh_catalog_in_background():
+    global _catalog_refresh_task
+    if _catalog_refresh_task is None or _catalog_refresh_task.done():
+        _catalog_refresh_task = asyncio.create_task(_refresh_catalog())
+    return _catalog_refresh_task
+
+# Function to get the current catalog artifact without waiting on a refresh
+async def get_catalog_artifact():
+    global _catalog_artifact
+    if _catalog_artifact is None:
+        # Nothing to serve yet, so the first caller builds it and the rest wait
+        async with _catalog_build_lock:
+            if _catalog_artifact is None:
+                _catalog_artifact = await asyncio.to_thread(_load_catalog_artifact)
+
+    artifact = _catalog_artifact
+    if time.time() - artifact.built_at > CATALOG_TTL:
+        refresh_catalog_in_background()
+    return artifact
+
+# Background job: warm the catalog on startup, then re-scrape it periodically
+async def _refresh_catalog_periodically():
+    try:
+        await get_catalog_artifact()
+    except Exception:
+        # The first request retries the build
+        logger.exception("Initial catalog build failed")
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+        await refresh_catalog_in_background()
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.catalog_refresh_task = asyncio.create_task(_refresh_catalog_periodically())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.catalog_refresh_task.cancel()
+    query_batcher.stop()
 
 @app.get("/")
 async def root():
@@ -178,52 +599,29 @@ async def recommend_assessments(request: QueryRequest):
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Query text cannot be empty")
 
-        # Get assessments from catalog
-        assessments = scrape_shl_catalog()
+        # Get the catalog, its embeddings and parsed durations
+        catalog = await get_catalog_artifact()
         
-        if not assessments:
+        if not len(catalog):
             raise HTTPException(status_code=500, detail="Failed to fetch assessments from catalog. Please try again later.")
         
-        # Process query
+        # Process query (batched with other in-flight requests)
         try:
-            query_embedding = process_query(request.text)
+            query_embedding = await query_batcher.encode(request.text)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
         
-        # Get assessment embeddings
-        try:
-            assessment_embeddings = get_assessment_embeddings(assessments)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error generating assessment embeddings: {str(e)}")
-        
-        # Calculate similarities
-        similarities = cosine_similarity([query_embedding], assessment_embeddings)[0]
-        
-        # Create list of (similarity, assessment) tuples and sort by similarity
-        ranked_assessments = list(zip(similarities, assessments))
-        ranked_assessments.sort(reverse=True)
+        # Calculate similarities (embeddings are unit length, so cosine is a dot product)
+        similarities = compute_similarities(catalog.embeddings, query_embedding)
         
-        # Filter by duration if specified
-        filtered_assessments = []
-        for sim, assessment in ranked_assessments:
-            # Only consider assessments with similarity above threshold
-            if sim < 0.1:  # Adjust this threshold as needed
-                continue
-                
-            if request.max_duration:
-                # Extract numeric duration value
-                duration_match = re.search(r'\d+', assessment.duration)
-                if duration_match:
-                    duration_value = int(duration_match.group())
-                    if duration_value <= request.max_duration:
-                        filtered_assessments.append(assessment)
-                else:
-                    # Include assessments with unspecified duration
-                    filtered_assessments.append(assessment)
-            else:
-                filtered_assessments.append(assessment)
+        # Keep assessments above the similarity threshold and, if requested, within
+        # the duration limit (assessments with unspecified duration are included)
+        mask = similarities >= 0.1  # Adjust this threshold as needed
+        if request.max_duration:
+            mask &= (catalog.durations_int <= request.max_duration) | (catalog.durations_int < 0)
+        candidates = np.flatnonzero(mask)
         
-        if not filtered_assessments:
+        if not candidates.size:
             if request.max_duration:
                 raise HTTPException(
                     status_code=404,
@@ -235,8 +633,10 @@ async def recommend_assessments(request: QueryRequest):
             )
         
         # Return top recommendations
+        k = len(candidates) if request.max_results is None else min(request.max_results, len(candidates))
+        top_idx = candidates[top_k_indices(similarities[candidates], k)]
         return RecommendationResponse(
-            recommendations=filtered_assessments[:request.max_results]
+            recommendations=[catalog.assessment(i) for i in top_idx]
         )
     
     except HTTPException as he:
@@ -10,6 +10,30 @@ st.set_page_config(
     layout="wide"
 )
 
+# Use deployed URL for production
+API_URL = "https://shl-assessment-recommender.onrender.com"
+
+class APIError(Exception):
+    pass
+
+# Reuse one HTTP session across reruns so requests share keep-alive connections
+@st.cache_resource
+def get_api_session():
+    return requests.Session()
+
+# Memoize API responses so repeating a query doesn't hit the backend again
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_recommendations(query: str, max_duration: int) -> dict:
+    response = get_api_session().post(
+        f"{API_URL}/recommend",
+        json={"text": query, "max_duration": max_duration},
+        timeout=30
+    )
+    # Raising keeps failed responses out of the cache
+    if response.status_code != 200:
+        raise APIError(response.text)
+    return response.json()
+
 # Title and description
 st.title("SHL Assessment Recommendation System")
 st.markdown("""
@@ -38,40 +62,32 @@ if st.button("Get Recommendations", type="primary"):
     if query:
         try:
             # Make API request
-            # Use deployed URL for production
-            API_URL = "https://shl-assessment-recommender.onrender.com"
-            response = requests.post(
-                f"{API_URL}/recommend",
-                json={"text": query, "max_duration": max_duration}
-            )
+            data = fetch_recommendations(query, max_duration)
+            recommendations = data.get('recommendations', [])
             
-            if response.status_code == 200:
-                data = response.json()
-                recommendations = data.get('recommendations', [])
+            if recommendations:
+                # Convert to DataFrame for better display
+                df = pd.DataFrame(recommendations)
+                
+                # Rename columns for better display
+                df.columns = ['Assessment Name', 'URL', 'Remote Testing',
+                             'Adaptive Support', 'Duration', 'Test Type']
                 
-                if recommendations:
-                    # Convert to DataFrame for better display
-                    df = pd.DataFrame(recommendations)
-                    
-                    # Rename columns for better display
-                    df.columns = ['Assessment Name', 'URL', 'Remote Testing',
-                                 'Adaptive Support', 'Duration', 'Test Type']
-                    
-                    # Display results
-                    st.subheader("Recommended Assessments")
-                    st.dataframe(
-                        df,
-                        column_config={
-                            "URL": st.column_config.LinkColumn(),
-                            "Remote Testing": st.column_config.CheckboxColumn(),
-                            "Adaptive Support": st.column_config.CheckboxColumn()
-                        },
-                        hide_index=True
-                    )
-                else:
-                    st.warning("No matching assessments found. Try adjusting your query or duration filter.")
+                # Display results
+                st.subheader("Recommended Assessments")
+                st.dataframe(
+                    df,
+                    column_config={
+                        "URL": st.column_config.LinkColumn(),
+                        "Remote Testing": st.column_config.CheckboxColumn(),
+                        "Adaptive Support": st.column_config.CheckboxColumn()
+                    },
+                    hide_index=True
+                )
             else:
-                st.error(f"Error: {response.text}")
+                st.warning("No matching assessments found. Try adjusting your query or duration filter.")
+        except APIError as e:
+            st.error(f"Error: {str(e)}")
         except Exception as e:
             st.error(f"Failed to get recommendations: {str(e)}")
     else: